@@ -1,13 +1,18 @@
 import json
 import csv
 import os
+import functools
+import hashlib
+import pickle
+import shutil
 from datetime import datetime, timedelta
 from atproto_client.models import get_or_create
 from atproto import CAR, models
 from atproto_firehose import FirehoseSubscribeReposClient, parse_subscribe_repos_message
-from collections import defaultdict, deque
+from collections import defaultdict, deque, OrderedDict, Counter
 import time
 from pathlib import Path
+from urllib.parse import urlsplit
 from rich.live import Live
 from rich.table import Table
 from rich.console import Console
@@ -17,20 +22,78 @@ from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn
 from rich.syntax import Syntax
 from rich import box
 import threading
-from queue import Queue
+from queue import Queue, Full
 import re
 import psutil
 import humanize
-from typing import Optional, Dict, List, Set
+from typing import Optional, Dict, List, Set, Tuple
 from rich.console import Group
 from rich.text import Text
 
+try:
+    import orjson
+except ImportError:  # Fall back to the stdlib json encoder
+    orjson = None
+
+_WS_RE = re.compile(r'\s+')
+_HASHTAG_RE = re.compile(r'#(\w+)')
+_DID_SANITIZE_RE = re.compile(r'[<>:"/\\|?*]')
+_SHARD_RE = re.compile(r'[0-9a-f]{2}')
+# Maps every character matched by \s to a plain space
+_WS_TABLE = str.maketrans(dict.fromkeys(
+    '\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f\x85\xa0\u1680\u2000\u2001\u2002\u2003'
+    '\u2004\u2005\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000',
+    ' '
+))
+
+# Max firehose messages waiting for a worker, and max worker threads
+MESSAGE_QUEUE_SIZE = 10_000
+MAX_MESSAGE_WORKERS = 2
+
+# Firehose op path prefix for post records
+POST_PATH_PREFIX = "app.bsky.feed.post/"
+
+# CSV headers per user file kind; queued rows carry only the kind
+POST_HEADERS = (
+    'timestamp', 'text', 'has_images', 'has_links',
+    'is_reply', 'reply_to_uri', 'thread_root_uri',
+    'image_count', 'link_count', 'hashtag_count'
+)
+LINK_HEADERS = ('timestamp', 'url', 'domain', 'context_text')
+MEDIA_HEADERS = ('timestamp', 'image_alt', 'image_type', 'context_text')
+HEADERS = {
+    'posts': POST_HEADERS,
+    'links': LINK_HEADERS,
+    'media': MEDIA_HEADERS
+}
+
+# Rows buffered per file before a write, and max seconds a row may sit buffered
+FLUSH_BATCH_SIZE = 64
+FLUSH_INTERVAL = 0.5
+# Buffer size for CSV file handles (default is only 8 KiB)
+WRITE_BUFFER_SIZE = 1 << 18
+# Max CSV handles kept open by the writer, and seconds between flushes to disk
+MAX_OPEN_FILES = 256
+SYNC_INTERVAL = 5.0
+# Max DIDs whose resolved user paths are cached
+USER_CACHE_SIZE = 100_000
+
+def user_shard(safe_did: str) -> str:
+    """Shard directory name (00-ff) for a sanitized DID"""
+    return hashlib.blake2b(safe_did.encode(), digest_size=1).hexdigest()
+
+@functools.lru_cache(maxsize=8192)
+def _domain_of(url: str) -> str:
+    """Extract domain from URL (cached, popular domains repeat heavily)"""
+    try:
+        return urlsplit(url).netloc or "unknown"
+    except (ValueError, TypeError, AttributeError):
+        return "unknown"
+
 class JSONExtra(json.JSONEncoder):
     def default(self, obj):
-        try:
-            return json.JSONEncoder.default(self, obj)
-        except:
-            return repr(obj)
+        # Only called for objects json can't encode natively
+        return repr(obj)
 
 class EnhancedStats:
     def __init__(self):
@@ -44,13 +107,14 @@ class EnhancedStats:
         self.posts_per_minute = deque(maxlen=60)  # Last 60 minutes
         self.posts_per_hour = deque(maxlen=24)    # Last 24 hours
         self.posts_this_minute = 0
+        self.posts_last_hour_total = 0  # Running sum of posts_per_minute
         self.minute_start_time = time.time()
         
         self.language_stats = defaultdict(int)
-        self.most_active_users = defaultdict(int)
-        self.popular_domains = defaultdict(int)
-        self.media_types = defaultdict(int)
-        self.hashtag_stats = defaultdict(int)
+        self.most_active_users = Counter()
+        self.popular_domains = Counter()
+        self.media_types = Counter()
+        self.hashtag_stats = Counter()
         
         self.processing_times = deque(maxlen=1000)
         self.memory_usage = deque(maxlen=60)
@@ -66,17 +130,23 @@ class EnhancedStats:
         
         # Update minute stats
         if current_time - self.last_minute_timestamp >= 60:
+            if len(self.posts_per_minute) == self.posts_per_minute.maxlen:
+                self.posts_last_hour_total -= self.posts_per_minute[0]
             self.posts_per_minute.append(self.posts_this_minute)
+            self.posts_last_hour_total += self.posts_this_minute
             self.posts_this_minute = 0
             self.last_minute_timestamp = current_time
             
         # Update hourly stats
         if current_time - self.last_hour_timestamp >= 3600:
-            total_posts_hour = sum(self.posts_per_minute)
-            self.posts_per_hour.append(total_posts_hour)
+            self.posts_per_hour.append(self.posts_last_hour)
             self.last_hour_timestamp = current_time
             self.active_users_last_hour.clear()
 
+    @property
+    def posts_last_hour(self) -> int:
+        return self.posts_last_hour_total
+
     def get_processing_stats(self) -> Dict[str, float]:
         if not self.processing_times:
             return {"avg": 0, "min": 0, "max": 0}
@@ -92,9 +162,12 @@ class FirehoseMonitor:
             self.data_dir = Path(data_dir)
             self.data_dir.mkdir(exist_ok=True)
             
-            # Create users directory
+            # Create users directory, sharded by a one-byte hash of the sanitized DID
             self.users_dir = self.data_dir / "users"
             self.users_dir.mkdir(exist_ok=True)
+            for shard in range(256):
+                (self.users_dir / f"{shard:02x}").mkdir(exist_ok=True)
+            self.migrate_user_dirs()
             
             # Create analytics directory
             self.analytics_dir = self.data_dir / "analytics"
@@ -103,12 +176,28 @@ class FirehoseMonitor:
             # Enhanced statistics
             self.stats = EnhancedStats()
             
-            # Initialize user count from existing directories
+            # Sanitized DIDs of users already counted
+            self.known_dids: Set[str] = set()
+            
+            # Resolved user paths per DID (least recently used evicted first)
+            self.user_paths_cache: OrderedDict = OrderedDict()
+            
+            # Initialize user count from the user cache or existing directories
+            self.user_cache_file = self.data_dir / "_users.pkl"
             self.init_user_count()
             
             # Create queues for thread-safe operations
-            self.file_queue = Queue()
+            self.file_queue: deque = deque()
+            self.file_cond = threading.Condition()
             self.display_queue = Queue()
+            self.message_queue = Queue(maxsize=MESSAGE_QUEUE_SIZE)
+            self.dropped_messages = 0
+            
+            # Serializes process_post across message workers
+            self.stats_lock = threading.Lock()
+            
+            # Open user file handles, owned by the writer thread (LRU order)
+            self.open_files: OrderedDict = OrderedDict()
             
             # Start worker threads
             self.writer_thread = threading.Thread(target=self.file_writer, daemon=True)
@@ -117,22 +206,39 @@ class FirehoseMonitor:
             # Initialize rich components
             self.init_rich_components()
             
+            # Cached top items for the analytics panel
+            self._last_topk_ts = 0
+            self._top_domains: List[Tuple[str, int]] = []
+            self._top_media: List[Tuple[str, int]] = []
+            self._top_hashtags: List[Tuple[str, int]] = []
+            
             # Performance monitoring
             self.process = psutil.Process()
+            
+            # Decode firehose messages off the client's receive thread
+            worker_count = min(MAX_MESSAGE_WORKERS, psutil.cpu_count() or 1)
+            self.message_threads = [
+                threading.Thread(target=self.message_worker, daemon=True)
+                for _ in range(worker_count)
+            ]
+            for thread in self.message_threads:
+                thread.start()
 
     def init_user_count(self):
-        """Initialize user count from existing directories"""
+        """Initialize user count from the saved user cache or existing directories"""
+        if self.load_user_cache():
+            return
+        
         try:
             # Count directories that have actual data files
             total_users = 0
-            for user_dir in self.users_dir.iterdir():
+            for user_dir in self.iter_user_dirs():
                 if user_dir.is_dir():
                     # Check if directory has any CSV files
                     has_data = any(f.suffix == '.csv' for f in user_dir.iterdir())
                     if has_data:
                         total_users += 1
-                        # Create counted marker
-                        (user_dir / '.counted').touch()
+                        self.known_dids.add(user_dir.name)
             
             self.stats.total_users = total_users
             
@@ -140,6 +246,76 @@ class FirehoseMonitor:
             print(f"Error initializing user count: {e}")
             self.stats.total_users = 0  # Reset to 0 on error
 
+    def iter_user_dirs(self):
+        """Yield user directories from all shards"""
+        for entry in self.users_dir.iterdir():
+            if entry.is_dir() and _SHARD_RE.fullmatch(entry.name):
+                yield from entry.iterdir()
+
+    def migrate_user_dirs(self):
+        """Move user directories from before sharding into their shard"""
+        try:
+            for entry in self.users_dir.iterdir():
+                # Only sanitized DIDs, older versions also wrote every post
+                # to a bogus app.bsky.feed.post directory, which is left as is
+                if not entry.is_dir() or not entry.name.startswith('did_'):
+                    continue
+                
+                target = self.users_dir / user_shard(entry.name) / entry.name
+                if not target.exists():
+                    entry.rename(target)
+                    continue
+                
+                # Both layouts hold data for this user, keep the older rows first
+                for legacy_file in entry.iterdir():
+                    target_file = target / legacy_file.name
+                    if target_file.exists() and legacy_file.suffix == '.csv':
+                        with open(target_file, newline='', encoding='utf-8') as src, \
+                                open(legacy_file, 'a', newline='', encoding='utf-8') as dst:
+                            next(src, None)  # Skip header
+                            shutil.copyfileobj(src, dst)
+                    if legacy_file.suffix == '.csv' or not target_file.exists():
+                        legacy_file.replace(target_file)
+                    else:
+                        legacy_file.unlink()
+                entry.rmdir()
+                
+        except Exception as e:
+            print(f"Error migrating user directories: {e}")
+
+    def load_user_cache(self) -> bool:
+        """Load known users saved at the last shutdown"""
+        if not self.user_cache_file.exists():
+            return False
+        
+        try:
+            with open(self.user_cache_file, 'rb') as f:
+                cached = pickle.load(f)
+            self.known_dids = set(cached["dids"])
+            self.stats.total_users = cached["total"]
+        except Exception as e:
+            print(f"Error loading user cache: {e}")
+            self.known_dids = set()
+            return False
+        finally:
+            # The cache is only valid until new data is written, so an
+            # unclean shutdown falls back to a full directory scan
+            self.user_cache_file.unlink(missing_ok=True)
+        
+        return True
+
+    def save_user_cache(self):
+        """Save known users so the next startup can skip the directory scan"""
+        try:
+            with open(self.user_cache_file, 'wb') as f:
+                pickle.dump(
+                    {"total": self.stats.total_users, "dids": list(self.known_dids)},
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL
+                )
+        except Exception as e:
+            print(f"Error saving user cache: {e}")
+
     def init_rich_components(self):
         """Initialize rich UI components"""
         self.layout = Layout()
@@ -173,60 +349,151 @@ class FirehoseMonitor:
         """Clean text for CSV storage"""
         if text is None:
             return ""
-        # Remove newlines and normalize whitespace
-        text = re.sub(r'\s+', ' ', str(text).strip())
+        # Remove newlines and normalize whitespace, only using the regex
+        # when there are runs of spaces left to collapse
+        text = str(text).translate(_WS_TABLE).strip()
+        if '  ' in text:
+            text = _WS_RE.sub(' ', text)
         # Escape any remaining special characters
         return text.replace('"', '""')
 
-    def get_user_dir(self, author_did: str) -> Path:
-        """Get or create directory for specific user"""
+    def get_user_paths(self, author_did: str) -> Tuple[Path, Dict[str, Path]]:
+        """Get or create a user's directory and data file paths (LRU cached)"""
+        user_paths = self.user_paths_cache.get(author_did)
+        if user_paths is not None:
+            self.user_paths_cache.move_to_end(author_did)
+            return user_paths
+        
         # Sanitize DID for filesystem
-        safe_did = re.sub(r'[<>:"/\\|?*]', '_', author_did)
-        user_dir = self.users_dir / safe_did
+        safe_did = _DID_SANITIZE_RE.sub('_', author_did)
+        user_dir = self.users_dir / user_shard(safe_did) / safe_did
         user_dir.mkdir(exist_ok=True)
-        return user_dir
-
-    def get_user_files(self, author_did: str) -> Dict[str, Path]:
-        """Get paths for user's data files"""
-        user_dir = self.get_user_dir(author_did)
-        return {
+        user_files = {
             'posts': user_dir / 'posts.csv',
             'links': user_dir / 'links.csv',
             'media': user_dir / 'media.csv',
             'interactions': user_dir / 'interactions.csv',
             'metadata': user_dir / 'metadata.json'
         }
+        
+        if len(self.user_paths_cache) >= USER_CACHE_SIZE:
+            self.user_paths_cache.popitem(last=False)
+        user_paths = (user_dir, user_files)
+        self.user_paths_cache[author_did] = user_paths
+        return user_paths
+
+    def get_user_dir(self, author_did: str) -> Path:
+        """Get or create directory for specific user"""
+        return self.get_user_paths(author_did)[0]
+
+    def get_user_files(self, author_did: str) -> Dict[str, Path]:
+        """Get paths for user's data files"""
+        return self.get_user_paths(author_did)[1]
+
+    def get_file_writer(self, file_path: Path, headers: Tuple[str, ...]):
+        """Get a cached CSV writer for a user file, opening it if needed"""
+        if file_path in self.open_files:
+            self.open_files.move_to_end(file_path)
+            return self.open_files[file_path][1]
+        
+        # Evict the least recently used handle when full
+        if len(self.open_files) >= MAX_OPEN_FILES:
+            _, (old_file, _) = self.open_files.popitem(last=False)
+            old_file.close()
+        
+        file_exists = file_path.exists()
+        mode = 'a' if file_exists else 'w'
+        f = open(file_path, mode, buffering=WRITE_BUFFER_SIZE, newline='', encoding='utf-8')
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(headers)
+        self.open_files[file_path] = (f, writer)
+        return writer
+
+    def flush_user_file(self, file_path: Path, rows: List[list], headers: Tuple[str, ...]):
+        """Append a batch of rows to a user CSV, writing headers if new"""
+        try:
+            self.get_file_writer(file_path, headers).writerows(rows)
+        except Exception as e:
+            print(f"Error writing to file {file_path}: {e}")
+
+    def close_user_files(self):
+        """Close all cached user file handles"""
+        for file_path, (f, _) in self.open_files.items():
+            try:
+                f.close()
+            except Exception as e:
+                print(f"Error closing file {file_path}: {e}")
+        self.open_files.clear()
+
+    def queue_file_rows(self, items: List[tuple]):
+        """Hand rows (or the None poison pill) to the writer thread"""
+        with self.file_cond:
+            self.file_queue.extend(items)
+            self.file_cond.notify()
 
     def file_writer(self):
         """Thread function to handle file writing"""
+        # Rows are buffered per file and flushed in batches
+        pending: Dict[Path, Tuple[str, List[list]]] = {}
+        last_flush = time.time()
+        last_sync = time.time()
+        
         while True:
-            data = self.file_queue.get()
-            if data is None:  # Poison pill
-                break
+            # Drain everything queued in a single wake-up
+            with self.file_cond:
+                if not self.file_queue:
+                    self.file_cond.wait(timeout=FLUSH_INTERVAL)
+                batch = list(self.file_queue)
+                self.file_queue.clear()
+            
+            stop = False
+            for data in batch:
+                if data is None:  # Poison pill
+                    stop = True
+                    break
                 
-            file_path, row, headers = data
-            file_exists = file_path.exists()
+                kind, file_path, row = data
+                if file_path not in pending:
+                    pending[file_path] = (kind, [])
+                rows = pending[file_path][1]
+                rows.append(row)
+                if len(rows) >= FLUSH_BATCH_SIZE:
+                    self.flush_user_file(file_path, rows, HEADERS[kind])
+                    del pending[file_path]
             
-            try:
-                mode = 'a' if file_exists else 'w'
-                with open(file_path, mode, newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    if not file_exists:
-                        writer.writerow(headers)
-                    writer.writerow(row)
-            except Exception as e:
-                print(f"Error writing to file {file_path}: {e}")
+            if stop:
+                break
+            
+            # Periodically flush everything still buffered
+            current_time = time.time()
+            if current_time - last_flush >= FLUSH_INTERVAL:
+                for file_path, (kind, rows) in pending.items():
+                    self.flush_user_file(file_path, rows, HEADERS[kind])
+                pending.clear()
+                last_flush = current_time
+            
+            # Push open handles' buffers to disk to bound data loss
+            if current_time - last_sync >= SYNC_INTERVAL:
+                for file_path, (f, _) in self.open_files.items():
+                    try:
+                        f.flush()
+                    except Exception as e:
+                        print(f"Error flushing file {file_path}: {e}")
+                last_sync = current_time
+        
+        # Flush remaining rows on shutdown
+        for file_path, (kind, rows) in pending.items():
+            self.flush_user_file(file_path, rows, HEADERS[kind])
+        self.close_user_files()
 
     def extract_hashtags(self, text: str) -> List[str]:
         """Extract hashtags from text"""
-        return re.findall(r'#(\w+)', text)
+        return _HASHTAG_RE.findall(text)
 
     def extract_domains(self, url: str) -> str:
         """Extract domain from URL"""
-        try:
-            return url.split('/')[2]
-        except (IndexError, AttributeError):
-            return "unknown"
+        return _domain_of(url)
 
     def generate_header(self) -> Panel:
         """Generate header panel"""
@@ -253,7 +520,7 @@ class FirehoseMonitor:
         
         # Calculate rates
         posts_last_min = self.stats.posts_this_minute
-        posts_last_hour = sum(self.stats.posts_per_minute) if self.stats.posts_per_minute else 0
+        posts_last_hour = self.stats.posts_last_hour
         
         # Add rows
         table.add_row(
@@ -296,10 +563,10 @@ class FirehoseMonitor:
         from rich.console import Group
         from rich.text import Text
         
-        # Get system metrics
-        memory_usage = self.process.memory_info().rss / 1024 / 1024  # MB
-        cpu_percent = self.process.cpu_percent()
-        queue_size = self.file_queue.qsize()
+        # Get system metrics (sampled once per second in process_post)
+        memory_usage = self.stats.memory_usage[-1] if self.stats.memory_usage else 0  # MB
+        cpu_percent = self.stats.cpu_usage[-1] if self.stats.cpu_usage else 0
+        queue_size = len(self.file_queue)
         
         # Get processing stats
         proc_stats = self.stats.get_processing_stats()
@@ -324,6 +591,8 @@ class FirehoseMonitor:
             f"Avg: {proc_stats['avg']*1000:.2f}, "
             f"Min: {proc_stats['min']*1000:.2f}, "
             f"Max: {proc_stats['max']*1000:.2f}"
+            f"\nMessages Queued: {self.message_queue.qsize():,}, "
+            f"Dropped: {self.dropped_messages:,}"
         )
         
         # Combine all content
@@ -349,7 +618,7 @@ class FirehoseMonitor:
         posts_table.add_column("Author", style="magenta", width=15)
         posts_table.add_column("Content", style="white", width=50)
         
-        for timestamp, author, text in self.stats.recent_posts:
+        for timestamp, author, text in list(self.stats.recent_posts):
             time_str = datetime.fromtimestamp(timestamp).strftime("%H:%M:%S")
             posts_table.add_row(
                 time_str, 
@@ -359,41 +628,48 @@ class FirehoseMonitor:
         
         return Panel(posts_table, title="[bold]Recent Activity[/bold]", border_style="green")
 
+    def refresh_top_items(self):
+        """Recompute the cached top domains, media types and hashtags"""
+        # Hold the stats lock, the message workers mutate these counters
+        with self.stats_lock:
+            self._top_domains = self.stats.popular_domains.most_common(3)
+            self._top_media = self.stats.media_types.most_common(3)
+            self._top_hashtags = self.stats.hashtag_stats.most_common(3)
+        self._last_topk_ts = time.time()
+
     def generate_analytics_panel(self) -> Panel:
         """Generate analytics panel"""
         analytics_table = Table(show_header=True, header_style="bold magenta", box=box.ROUNDED)
         analytics_table.add_column("Category", style="cyan")
         analytics_table.add_column("Top Items", style="white")
         
+        # Recompute top items at most once per second
+        if time.time() - self._last_topk_ts > 1.0:
+            self.refresh_top_items()
+        
         # Add popular domains
-        top_domains = sorted(
-            self.stats.popular_domains.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:3]
-        domains_str = ", ".join(f"{domain}: {count}" for domain, count in top_domains)
+        domains_str = ", ".join(f"{domain}: {count}" for domain, count in self._top_domains)
         analytics_table.add_row("Popular Domains", domains_str)
         
         # Add top media types
-        top_media = sorted(
-            self.stats.media_types.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:3]
-        media_str = ", ".join(f"{media}: {count}" for media, count in top_media)
+        media_str = ", ".join(f"{media}: {count}" for media, count in self._top_media)
         analytics_table.add_row("Media Types", media_str)
         
         # Add top hashtags
-        top_hashtags = sorted(
-            self.stats.hashtag_stats.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:3]
-        hashtags_str = ", ".join(f"#{tag}: {count}" for tag, count in top_hashtags)
+        hashtags_str = ", ".join(f"#{tag}: {count}" for tag, count in self._top_hashtags)
         analytics_table.add_row("Trending Hashtags", hashtags_str)
         
         return Panel(analytics_table, title="[bold]Analytics[/bold]", border_style="red")
 
+    def display_interval(self) -> float:
+        """Seconds until the next redraw, slowing down when the writer falls behind"""
+        depth = len(self.file_queue)
+        if depth < 500:
+            return 0.25  # Shorter sleep for more responsive updates
+        if depth < 5000:
+            return 1.0
+        return 2.0
+
     def update_display(self) -> Layout:
         """Update the live display"""
         # Update layout components
@@ -405,64 +681,49 @@ class FirehoseMonitor:
         
         return self.layout
 
-    def write_to_user_files(self, raw_data: dict, author_did: str, created_at: str, text: str):
+    def write_to_user_files(self, raw_data: dict, author_did: str, created_at: str,
+                            text_cleaned: str, hashtags: List[str],
+                            links_list: List[Tuple[str, str]], images_list: List[dict]):
         """Write post data to appropriate user files"""
         user_files = self.get_user_files(author_did)
         
         # Write to posts.csv
-        post_headers = [
-            'timestamp', 'text', 'has_images', 'has_links',
-            'is_reply', 'reply_to_uri', 'thread_root_uri',
-            'image_count', 'link_count', 'hashtag_count'
-        ]
-        
-        has_images = 'embed' in raw_data and raw_data['embed'].get('$type') == 'app.bsky.embed.images'
-        image_count = len(raw_data.get('embed', {}).get('images', [])) if has_images else 0
-        
         has_links = bool(raw_data.get('facets', []))
-        link_count = sum(1 for facet in raw_data.get('facets', [])
-                        for feature in facet.get('features', [])
-                        if feature.get('$type') == 'app.bsky.richtext.facet#link')
-        
-        hashtags = self.extract_hashtags(text)
+        reply = raw_data.get('reply') or {}
         
         post_row = [
             created_at,
-            self.clean_text(text),
-            '1' if has_images else '0',
+            text_cleaned,
+            '1' if images_list else '0',
             '1' if has_links else '0',
-            '1' if 'reply' in raw_data else '0',
-            raw_data.get('reply', {}).get('parent', {}).get('uri', ''),
-            raw_data.get('reply', {}).get('root', {}).get('uri', ''),
-            str(image_count),
-            str(link_count),
+            '1' if reply else '0',
+            (reply.get('parent') or {}).get('uri', ''),
+            (reply.get('root') or {}).get('uri', ''),
+            str(len(images_list)),
+            str(len(links_list)),
             str(len(hashtags))
         ]
         
-        self.file_queue.put((user_files['posts'], post_row, post_headers))
+        file_rows = [('posts', user_files['posts'], post_row)]
         
         # Write to links.csv if there are links
-        if has_links:
-            link_headers = ['timestamp', 'url', 'domain', 'context_text']
-            for facet in raw_data['facets']:
-                for feature in facet.get('features', []):
-                    if feature.get('$type') == 'app.bsky.richtext.facet#link':
-                        url = feature.get('uri', '')
-                        domain = self.extract_domains(url)
-                        link_row = [created_at, url, domain, self.clean_text(text)]
-                        self.file_queue.put((user_files['links'], link_row, link_headers))
+        if links_list:
+            for url, domain in links_list:
+                link_row = [created_at, url, domain, text_cleaned]
+                file_rows.append(('links', user_files['links'], link_row))
         
         # Write to media.csv if there are images
-        if has_images:
-            media_headers = ['timestamp', 'image_alt', 'image_type', 'context_text']
-            for img in raw_data['embed'].get('images', []):
+        if images_list:
+            for img in images_list:
                 media_row = [
                     created_at,
                     self.clean_text(img.get('alt', '')),
                     img.get('mime', ''),
-                    self.clean_text(text)
+                    text_cleaned
                 ]
-                self.file_queue.put((user_files['media'], media_row, media_headers))
+                file_rows.append(('media', user_files['media'], media_row))
+        
+        self.queue_file_rows(file_rows)
 
     def process_post(self, raw_data: dict, author_did: str):
             """Process a single post with enhanced metrics tracking"""
@@ -472,99 +733,128 @@ class FirehoseMonitor:
             text = raw_data.get('text', '')
             created_at = raw_data.get('createdAt', '')
             
+            # Check if this is a new user before updating any stats
+            user_dir = self.get_user_dir(author_did)
+            if user_dir.name not in self.known_dids:
+                self.known_dids.add(user_dir.name)
+                self.stats.total_users += 1
+            
+            # Derive post content once for both stats and user files
+            text_cleaned = self.clean_text(text)
+            hashtags = self.extract_hashtags(text)
+            
+            embed = raw_data.get('embed')
+            if isinstance(embed, dict) and embed.get('$type') == 'app.bsky.embed.images':
+                images_list = embed.get('images') or []
+            else:
+                images_list = []
+            
+            links_list = []
+            for facet in raw_data.get('facets') or ():
+                for feature in facet.get('features') or ():
+                    if feature.get('$type') == 'app.bsky.richtext.facet#link':
+                        url = feature.get('uri', '')
+                        links_list.append((url, self.extract_domains(url)))
+            
+            # Update basic stats
+            self.stats.total_posts += 1
+            self.stats.posts_this_minute += 1
+            self.stats.active_users_last_hour.add(author_did)
+            self.stats.most_active_users[author_did] += 1
+            
+            # Update recent posts with more post details
+            post_info = (
+                time.time(),
+                author_did,
+                text_cleaned
+            )
+            self.stats.recent_posts.appendleft(post_info)
+            
+            # Process media
+            if images_list:
+                self.stats.posts_with_images += 1
+                self.stats.media_types.update(img.get('mime', 'unknown') for img in images_list)
+            
+            # Process links
+            if links_list:
+                self.stats.posts_with_links += 1
+                self.stats.popular_domains.update(
+                    domain for url, domain in links_list if domain != "unknown"
+                )
+            
+            # Process hashtags
+            if hashtags:
+                self.stats.hashtag_stats.update(tag.lower() for tag in hashtags)
+            
+            # Write to user files
             try:
-                # Check if this is a new user before updating any stats
-                user_files = self.get_user_files(author_did)
-                user_dir = self.get_user_dir(author_did)
-                
-                # Only count as new user if the directory was just created
-                # Use a special marker file to track if we've counted this user
-                user_counted_file = user_dir / '.counted'
-                if not user_counted_file.exists():
-                    self.stats.total_users += 1
-                    # Create marker file
-                    user_counted_file.touch()
-                
-                # Update basic stats
-                self.stats.total_posts += 1
-                self.stats.posts_this_minute += 1
-                self.stats.active_users_last_hour.add(author_did)
-                self.stats.most_active_users[author_did] += 1
-                
-                # Update recent posts with more post details
-                post_info = (
-                    time.time(),
-                    author_did,
-                    self.clean_text(text)
+                self.write_to_user_files(
+                    raw_data, author_did, created_at,
+                    text_cleaned, hashtags, links_list, images_list
                 )
-                self.stats.recent_posts.appendleft(post_info)
-                
-                # Process media with better error handling
-                if 'embed' in raw_data:
-                    embed = raw_data['embed']
-                    if isinstance(embed, dict) and embed.get('$type') == 'app.bsky.embed.images':
-                        self.stats.posts_with_images += 1
-                        for img in embed.get('images', []):
-                            mime_type = img.get('mime', 'unknown')
-                            self.stats.media_types[mime_type] += 1
-                
-                # Process links with improved domain extraction
-                if raw_data.get('facets'):
-                    for facet in raw_data['facets']:
-                        for feature in facet.get('features', []):
-                            if feature.get('$type') == 'app.bsky.richtext.facet#link':
-                                self.stats.posts_with_links += 1
-                                url = feature.get('uri', '')
-                                domain = self.extract_domains(url)
-                                if domain != "unknown":
-                                    self.stats.popular_domains[domain] += 1
-                
-                # Process hashtags
-                hashtags = self.extract_hashtags(text)
-                for tag in hashtags:
-                    tag = tag.lower()
-                    self.stats.hashtag_stats[tag] += 1
-                
-                # Write to user files
-                self.write_to_user_files(raw_data, author_did, created_at, text)
-                
-                # Update time-based metrics
-                self.stats.update_time_based_metrics()
-                
-                # Update performance metrics
-                processing_time = time.time() - start_time
-                self.stats.processing_times.append(processing_time)
-                
-                # Update system metrics (limit frequency to reduce overhead)
-                current_time = time.time()
-                if not hasattr(self, '_last_system_update') or current_time - self._last_system_update >= 1.0:
-                    self.stats.memory_usage.append(self.process.memory_info().rss / 1024 / 1024)
-                    self.stats.cpu_usage.append(self.process.cpu_percent())
-                    self._last_system_update = current_time
-                    
             except Exception as e:
-                print(f"Error processing post: {e}")
-                # Log the error but continue processing
-                pass
+                print(f"Error writing user files for {author_did}: {e}")
+            
+            # Update time-based metrics
+            self.stats.update_time_based_metrics()
+            
+            # Update performance metrics
+            processing_time = time.time() - start_time
+            self.stats.processing_times.append(processing_time)
+            
+            # Update system metrics (limit frequency to reduce overhead)
+            current_time = time.time()
+            if not hasattr(self, '_last_system_update') or current_time - self._last_system_update >= 1.0:
+                self.stats.memory_usage.append(self.process.memory_info().rss / 1024 / 1024)
+                self.stats.cpu_usage.append(self.process.cpu_percent())
+                self._last_system_update = current_time
 
     def on_message_handler(self, message):
-        """Handle incoming firehose messages"""
+        """Queue incoming firehose messages for the message workers"""
+        try:
+            self.message_queue.put_nowait(message)
+        except Full:
+            self.dropped_messages += 1
+
+    def message_worker(self):
+        """Thread function to decode and process queued firehose messages"""
+        while True:
+            message = self.message_queue.get()
+            if message is None:  # Poison pill
+                break
+            self.handle_message(message)
+
+    def handle_message(self, message):
+        """Handle a single firehose message"""
         try:
             commit = parse_subscribe_repos_message(message)
             if not isinstance(commit, models.ComAtprotoSyncSubscribeRepos.Commit):
                 return
                 
+            # Skip decoding the CAR for commits without new posts
+            # (likes, follows, reposts, ...), which are the majority
+            post_ops = [
+                op for op in commit.ops
+                if op.action == "create" and op.cid and op.path.startswith(POST_PATH_PREFIX)
+            ]
+            if not post_ops:
+                return
+            
             car = CAR.from_bytes(commit.blocks)
-            for op in commit.ops:
-                if op.action == "create" and op.cid:
-                    raw = car.blocks.get(op.cid)
-                    if raw:
-                        cooked = get_or_create(raw, strict=False)
-                        
-                        if cooked.py_type == "app.bsky.feed.post":
-                            # Extract author DID from the operation path
-                            author_did = op.path.split('/')[0]
-                            self.process_post(raw, author_did)
+            for op in post_ops:
+                raw = car.blocks.get(op.cid)
+                if raw:
+                    cooked = get_or_create(raw, strict=False)
+                    
+                    if cooked.py_type == "app.bsky.feed.post":
+                        # Op paths are "<collection>/<rkey>", the author is the repo
+                        author_did = commit.repo
+                        try:
+                            with self.stats_lock:
+                                self.process_post(raw, author_did)
+                        except Exception as e:
+                            # Log the error but continue with the commit's other posts
+                            print(f"Error processing post: {e}")
                         
         except Exception as e:
             print(f"Error processing message: {e}")
@@ -589,34 +879,56 @@ class FirehoseMonitor:
             client_thread.start()
             
             try:
-                with Live(self.update_display(), refresh_per_second=4) as live:
+                with Live(self.update_display(), auto_refresh=False) as live:
                     while True:
                         try:
-                            live.update(self.update_display())
-                            time.sleep(0.25)  # Shorter sleep for more responsive updates
+                            live.update(self.update_display(), refresh=True)
+                            time.sleep(self.display_interval())
                         except Exception as e:
                             print(f"Error updating display: {e}")
                             time.sleep(1)  # Wait a bit longer on error
                             
             except KeyboardInterrupt:
                 print("\n[bold yellow]Shutting down...[/bold yellow]")
-                self.file_queue.put(None)  # Signal writer thread to stop
+                
+                # Stop receiving, then let the workers drain queued messages
+                try:
+                    self.client.stop()
+                except Exception as e:
+                    print(f"Error stopping firehose client: {e}")
+                client_thread.join(timeout=5)
+                for _ in self.message_threads:
+                    self.message_queue.put(None)  # Signal message workers to stop
+                for thread in self.message_threads:
+                    thread.join()
+                
+                # Only stop the writer once no more rows can be queued
+                self.queue_file_rows([None])  # Signal writer thread to stop
                 self.writer_thread.join()
                 
                 # Save final analytics
                 analytics_file = self.analytics_dir / f"analytics_{int(time.time())}.json"
-                analytics_data = {
-                    "runtime": time.time() - self.stats.start_time,
-                    "total_posts": self.stats.total_posts,
-                    "total_users": self.stats.total_users,
-                    "popular_domains": dict(self.stats.popular_domains),
-                    "media_types": dict(self.stats.media_types),
-                    "hashtag_stats": dict(self.stats.hashtag_stats),
-                    "most_active_users": dict(self.stats.most_active_users)
-                }
+                with self.stats_lock:
+                    self.save_user_cache()
+                    analytics_data = {
+                        "runtime": time.time() - self.stats.start_time,
+                        "total_posts": self.stats.total_posts,
+                        "total_users": self.stats.total_users,
+                        "popular_domains": dict(self.stats.popular_domains),
+                        "media_types": dict(self.stats.media_types),
+                        "hashtag_stats": dict(self.stats.hashtag_stats),
+                        "most_active_users": dict(self.stats.most_active_users)
+                    }
                 
-                with open(analytics_file, 'w', encoding='utf-8') as f:
-                    json.dump(analytics_data, f, indent=2, cls=JSONExtra)
+                if orjson is not None:
+                    analytics_file.write_bytes(orjson.dumps(
+                        analytics_data,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                        default=repr
+                    ))
+                else:
+                    with open(analytics_file, 'w', encoding='utf-8') as f:
+                        json.dump(analytics_data, f, indent=2, cls=JSONExtra)
                 
                 print(f"[bold green]Final analytics saved to: {analytics_file}[/bold green]")
                 print("[bold green]Data collection completed[/bold green]")